@@ -6,7 +6,15 @@ from streamlit_folium import folium_static
 from geopy.distance import geodesic
 import numpy as np
 import os
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from folium import plugins
+from contraction_hierarchy import ContractionHierarchy, ch_files_for
+from regions import RegionStore
+from coverage import CoverageIndex, COVERAGE_BANDS
+from hospital_demand import distribute_hospital_demands
 
 # Set page config
 st.set_page_config(
@@ -69,25 +77,59 @@ EMERGENCY_CONTACTS = {
     }
 }
 
-# Load data with error handling
-def load_data():
-    try:
+# Default view for the single-region Dehradun dataset
+DEFAULT_MAP_CENTER = [30.3165, 78.0322]
+
+# Region-sharded datasets live here; without it the flat files in the working directory are used
+REGIONS_DIR = 'regions'
+
+# Budget for the raw shard data frames only; what is built from them is bounded by entry count below
+REGION_MEMORY_BUDGET_MB = 256
+
+# Caches keyed by the loaded data (working sets, graphs, hierarchies, maps, precompute jobs,
+# shared coverage) keep only the last few district selections
+WORKING_SET_CACHE_ENTRIES = 4
+
+@st.cache_resource
+def get_region_store():
+    """Shared shard cache, or None when the dataset is a single flat region"""
+    if not os.path.exists(os.path.join(REGIONS_DIR, 'regions.txt')):
+        return None
+    return RegionStore(REGIONS_DIR, memory_budget_mb=REGION_MEMORY_BUDGET_MB)
+
+# Read the network files; errors propagate so a failed read is never cached
+@st.cache_data(max_entries=WORKING_SET_CACHE_ENTRIES)
+def read_data_files(regions=()):
+    if regions:
+        frames = get_region_store().working_set(regions)
+        nodes_df = frames['nodes']
+        edges_df = frames['edges']
+        supplies_df = frames['relief_supplies']
+    else:
         nodes_df = pd.read_csv('nodes.txt')
         edges_df = pd.read_csv('edges.txt')
         supplies_df = pd.read_csv('relief_supplies.txt')
-        
-        # Create a pivot table for supplies to make it easier to work with
-        supplies_pivot = supplies_df.pivot_table(
-            index='Location',
-            columns='Supply_Type',
-            values=['Stock_Level', 'Vehicle_Capacity'],
-            aggfunc={'Stock_Level': 'first', 'Vehicle_Capacity': 'first'}
-        ).reset_index()
-        
-        # Flatten column names
-        supplies_pivot.columns = [f"{col[0]}_{col[1]}" if col[1] else col[0] for col in supplies_pivot.columns]
-        
-        return nodes_df, edges_df, supplies_df, supplies_pivot
+        # A flat dataset is all in view and has no transit hops
+        nodes_df['In_View'] = True
+        edges_df['Transit_Region'] = ''
+    
+    # Create a pivot table for supplies to make it easier to work with
+    supplies_pivot = supplies_df.pivot_table(
+        index='Location',
+        columns='Supply_Type',
+        values=['Stock_Level', 'Vehicle_Capacity'],
+        aggfunc={'Stock_Level': 'first', 'Vehicle_Capacity': 'first'}
+    ).reset_index()
+    
+    # Flatten column names
+    supplies_pivot.columns = [f"{col[0]}_{col[1]}" if col[1] else col[0] for col in supplies_pivot.columns]
+    
+    return nodes_df, edges_df, supplies_df, supplies_pivot
+
+# Load data with error handling
+def load_data(regions=()):
+    try:
+        return read_data_files(regions)
     except Exception as e:
         st.error("Error loading data files. Please check if all required files exist.")
         return None, None, None, None
@@ -114,6 +156,7 @@ def get_location_supplies(supplies_pivot, location_id):
     }
 
 # Create graph for pathfinding
+@st.cache_resource(max_entries=WORKING_SET_CACHE_ENTRIES)
 def create_graph(nodes_df, edges_df):
     try:
         G = nx.Graph()
@@ -132,14 +175,33 @@ def create_graph(nodes_df, edges_df):
             G.add_edge(row['From'], row['To'], 
                       weight=row['Travel_Time_min'],
                       distance=row['Distance_km'],
-                      condition=row['Road_Condition'])
+                      condition=row['Road_Condition'],
+                      transit=row['Transit_Region'])
         return G
     except Exception as e:
         st.error("Error creating network graph.")
         return None
 
+# Use the preprocessed contraction hierarchy when it still matches the road network
+@st.cache_resource(max_entries=WORKING_SET_CACHE_ENTRIES)
+def load_contraction_hierarchy(_G, nodes_df, edges_df, regions=()):
+    if regions:
+        # Region working sets change with the selection, so their hierarchy is only kept in memory
+        return ContractionHierarchy.build(_G)
+    ch_nodes_file, ch_edges_file = ch_files_for('edges.txt')
+    if os.path.exists(ch_nodes_file) and os.path.exists(ch_edges_file):
+        try:
+            ch = ContractionHierarchy.load(ch_nodes_file, ch_edges_file)
+            if ch.matches(_G):
+                return ch
+            st.warning("Saved route hierarchy is out of date; rebuilding it in memory. Run contraction_hierarchy.py to refresh it.")
+        except Exception as e:
+            st.warning(f"Could not read the saved route hierarchy ({e}); rebuilding it in memory.")
+    # Missing or stale files: contract in memory instead (run contraction_hierarchy.py to save it)
+    return ContractionHierarchy.build(_G)
+
 # Find nearest facilities with path information
-def find_nearest_facilities(G, start_node, facility_type):
+def find_nearest_facilities(G, ch, start_node, facility_type):
     try:
         facilities = [(node, data) for node, data in G.nodes(data=True) 
                      if data.get('type') == facility_type]
@@ -151,76 +213,22 @@ def find_nearest_facilities(G, start_node, facility_type):
         min_time = float('inf')
         best_path = []
         
+        # One bucket query covers every facility of this type
+        routes = ch.one_to_many(start_node, [facility for facility, _ in facilities])
         for facility, _ in facilities:
-            try:
-                path = nx.shortest_path(G, start_node, facility, weight='weight')
-                time = sum(G[path[i]][path[i+1]]['weight'] for i in range(len(path)-1))
-                if time < min_time:
-                    min_time = time
-                    nearest = facility
-                    best_path = path
-            except nx.NetworkXNoPath:
+            if facility not in routes:
                 continue
+            time, path = routes[facility]
+            if time < min_time:
+                min_time = time
+                nearest = facility
+                best_path = path
         
         return nearest, min_time, best_path
     except Exception as e:
         return None, float('inf'), []
 
-def distribute_hospital_demands(nodes_df, G):
-    """Distribute demands from affected areas to nearby hospitals based on proximity and capacity"""
-    # Get affected areas and hospitals
-    affected_areas = nodes_df[nodes_df['Type'] == 'affected_area'].copy()
-    hospitals = nodes_df[nodes_df['Type'] == 'hospital'].copy()
-    
-    # Create a dictionary to store hospital assignments
-    hospital_assignments = {hospital['ID']: [] for _, hospital in hospitals.iterrows()}
-    updated_demands = {hospital['ID']: 0 for _, hospital in hospitals.iterrows()}
-    
-    # For each affected area, distribute demand to nearest hospitals
-    for _, area in affected_areas.iterrows():
-        if area['Demand'] > 0:
-            area_demand = area['Demand']
-            hospital_distances = []
-            
-            # Calculate distances to all hospitals
-            for _, hospital in hospitals.iterrows():
-                try:
-                    path = nx.shortest_path(G, area['ID'], hospital['ID'], weight='weight')
-                    travel_time = sum(G[path[i]][path[i+1]]['weight'] for i in range(len(path)-1))
-                    available_capacity = hospital['Capacity'] - updated_demands[hospital['ID']]
-                    
-                    if available_capacity > 0:
-                        hospital_distances.append({
-                            'hospital_id': hospital['ID'],
-                            'travel_time': travel_time,
-                            'available_capacity': available_capacity
-                        })
-                except nx.NetworkXNoPath:
-                    continue
-            
-            # Sort hospitals by travel time
-            hospital_distances.sort(key=lambda x: x['travel_time'])
-            
-            # Distribute demand among hospitals
-            remaining_demand = area_demand
-            for hospital in hospital_distances:
-                if remaining_demand <= 0:
-                    break
-                    
-                assignable_demand = min(remaining_demand, hospital['available_capacity'])
-                if assignable_demand > 0:
-                    hospital_assignments[hospital['hospital_id']].append({
-                        'area_id': area['ID'],
-                        'area_name': area['Name'],
-                        'assigned_demand': assignable_demand,
-                        'travel_time': hospital['travel_time']
-                    })
-                    updated_demands[hospital['hospital_id']] += assignable_demand
-                    remaining_demand -= assignable_demand
-    
-    return hospital_assignments, updated_demands
-
-def create_route_map(nodes_df, start_node, end_node, path, map_center=[30.3165, 78.0322]):
+def create_route_map(nodes_df, start_node, end_node, path, map_center=DEFAULT_MAP_CENTER):
     """Create a map with route visualization"""
     m = folium.Map(location=map_center, zoom_start=12)
     
@@ -259,7 +267,7 @@ def create_route_map(nodes_df, start_node, end_node, path, map_center=[30.3165,
     
     return m
 
-def get_path_description(nodes_df, path):
+def get_path_description(nodes_df, path, G):
     """Get a human-readable description of the path"""
     route_desc = []
     for i, node_id in enumerate(path):
@@ -270,9 +278,16 @@ def get_path_description(nodes_df, path):
             route_desc.append(f"Arrive at {node['Name']}")
         else:
             route_desc.append(f"Continue through {node['Name']}")
+        # Transit hops stand for roads inside a district that is not loaded
+        if i < len(path) - 1 and G[node_id][path[i + 1]].get('transit'):
+            edge = G[node_id][path[i + 1]]
+            route_desc.append(
+                f"Travel through {get_region_store().region_name(edge['transit'])} district "
+                f"({edge['weight']:.1f} minutes)"
+            )
     return route_desc
 
-def allocate_rescue_teams(G, nodes_df, rescue_teams_df, disaster_zones_df):
+def allocate_rescue_teams(G, ch, nodes_df, rescue_teams_df, disaster_zones_df):
     """Allocate rescue teams to disaster zones based on proximity"""
     # Get unique disaster locations
     disaster_locations = disaster_zones_df['Location_ID'].unique()
@@ -291,19 +306,19 @@ def allocate_rescue_teams(G, nodes_df, rescue_teams_df, disaster_zones_df):
         best_team = None
         best_path = None
         
+        # Roads are undirected, so search once from the zone towards every team base
+        routes = ch.one_to_many(location_id, available_teams['Base_Location'].tolist())
         for _, team in available_teams.iterrows():
-            try:
-                path = nx.shortest_path(G, team['Base_Location'], location_id, weight='weight')
-                time = sum(G[path[i]][path[i+1]]['weight'] for i in range(len(path)-1))
-                # Adjust time based on team's speed relative to default speed (50 kmph)
-                time = time * (50 / team['Speed_kmph'])
-                
-                if time < min_time:
-                    min_time = time
-                    best_team = team
-                    best_path = path
-            except nx.NetworkXNoPath:
+            if team['Base_Location'] not in routes:
                 continue
+            time, path = routes[team['Base_Location']]
+            # Adjust time based on team's speed relative to default speed (50 kmph)
+            time = time * (50 / team['Speed_kmph'])
+            
+            if time < min_time:
+                min_time = time
+                best_team = team
+                best_path = path[::-1]
         
         if best_team is not None:
             # Get severity level for this location
@@ -322,184 +337,600 @@ def allocate_rescue_teams(G, nodes_df, rescue_teams_df, disaster_zones_df):
     
     return allocations
 
-def load_rescue_data():
+def allocate_for_zone(G, ch, nodes_df, rescue_teams_df, disaster_zones_df, zone_id):
+    """Find the fastest available rescue team for a single disaster zone"""
+    available_teams = rescue_teams_df[rescue_teams_df['Availability'] == 'Available'].copy()
+    min_time = float('inf')
+    best_team = None
+    best_path = None
+    routes = ch.one_to_many(zone_id, available_teams['Base_Location'].tolist())
+    for _, team in available_teams.iterrows():
+        if team['Base_Location'] not in routes:
+            continue
+        time, path = routes[team['Base_Location']]
+        time = time * (50 / team['Speed_kmph'])
+        if time < min_time:
+            min_time = time
+            best_team = team
+            best_path = path[::-1]
+    if best_team is not None:
+        severity = disaster_zones_df[disaster_zones_df['Location_ID'] == zone_id]['Severity_Level'].max()
+        return {
+            'team_id': best_team['Team_ID'],
+            'severity': severity,
+            'estimated_time': min_time,
+            'path': best_path,
+            'base_location': best_team['Base_Location'],
+            'speed': best_team['Speed_kmph']
+        }
+    else:
+        return None
+
+@st.cache_data(max_entries=WORKING_SET_CACHE_ENTRIES)
+def read_rescue_files(regions=()):
+    if regions:
+        frames = get_region_store().working_set(regions)
+        return frames['rescue_teams'], frames['disaster_zones']
+    return pd.read_csv('rescue_teams.txt'), pd.read_csv('disaster_zones.txt')
+
+def load_rescue_data(regions=()):
     try:
-        rescue_teams_df = pd.read_csv('rescue_teams.txt')
-        disaster_zones_df = pd.read_csv('disaster_zones.txt')
-        return rescue_teams_df, disaster_zones_df
+        return read_rescue_files(regions)
     except Exception as e:
         st.error("Error loading rescue data files.")
         return None, None
 
+# Hospital assignments of a region working set, computed over the whole state when it was split
+@st.cache_data(max_entries=WORKING_SET_CACHE_ENTRIES)
+def read_hospital_demand_file(regions):
+    return get_region_store().working_set(regions)['hospital_demand']
+
+def load_hospital_demand(regions=()):
+    """Saved hospital assignments, or None when they are computed from the loaded data"""
+    if not regions:
+        return None
+    try:
+        return read_hospital_demand_file(regions)
+    except Exception as e:
+        st.error("Error loading hospital demand files.")
+        return None
+
+def saved_hospital_demands(hospital_demand_df):
+    """Hospital assignments and demands in the shape distribute_hospital_demands returns"""
+    hospital_assignments = {}
+    updated_demands = {}
+    for row in hospital_demand_df.itertuples(index=False):
+        hospital_assignments.setdefault(row.Hospital, []).append({
+            'area_id': row.Area,
+            'area_name': row.Area_Name,
+            'assigned_demand': row.Assigned_Demand,
+            'travel_time': row.Travel_Time_min
+        })
+        updated_demands[row.Hospital] = row.Hospital_Demand
+    return hospital_assignments, updated_demands
+
+@st.cache_resource
+def get_executor():
+    """Shared worker pool used for background precomputation"""
+    return ThreadPoolExecutor(max_workers=2)
+
+class PrecomputeBatch:
+    """Background jobs queued for one loaded dataset, keyed by what they compute"""
+
+    def __init__(self, G, jobs):
+        # Holding the graph keeps its id from being reused while the batch is registered
+        self.G = G
+        self.jobs = jobs
+
+    def result(self, key, func, *args):
+        """Result of a queued job; if it has not started yet, cancel it and compute inline instead"""
+        future = self.jobs.get(key)
+        if future is None or future.cancel():
+            future = Future()
+            future.set_result(func(*args))
+            self.jobs[key] = future
+        return future.result()
+
+    def cancel_pending(self):
+        for future in self.jobs.values():
+            future.cancel()
+
+@st.cache_resource
+def get_precompute_batches():
+    """Precompute batches shared across sessions, most recently started last"""
+    return threading.Lock(), OrderedDict()
+
+def start_precomputation(G, ch, nodes_df, rescue_teams_df, disaster_zones_df):
+    """Start computing the expensive dashboard results in the background right after data load"""
+    lock, batches = get_precompute_batches()
+    with lock:
+        if id(G) in batches:
+            batches.move_to_end(id(G))
+            return batches[id(G)]
+
+        # Jobs of other datasets would only delay this one; whatever they still need is computed inline
+        for batch in batches.values():
+            batch.cancel_pending()
+        while len(batches) >= WORKING_SET_CACHE_ENTRIES:
+            batches.popitem(last=False)
+
+        executor = get_executor()
+        affected_area_ids = nodes_df[nodes_df['Type'] == 'affected_area']['ID'].tolist()
+        zone_ids = disaster_zones_df['Location_ID'].unique().tolist()
+
+        # Hospital demand distribution is needed on every full run, so queue it first;
+        # region working sets read the statewide distribution saved with the shards instead
+        jobs = {}
+        if get_region_store() is None:
+            jobs['hospital_demands'] = executor.submit(distribute_hospital_demands, nodes_df, G, ch)
+        for area_id in affected_area_ids:
+            for facility_type in ['shelter', 'hospital', 'warehouse']:
+                jobs[('nearest', area_id, facility_type)] = executor.submit(find_nearest_facilities, G, ch, area_id, facility_type)
+        for zone_id in zone_ids:
+            jobs[('allocation', zone_id)] = executor.submit(allocate_for_zone, G, ch, nodes_df, rescue_teams_df, disaster_zones_df, zone_id)
+            if ('nearest', zone_id, 'shelter') not in jobs:
+                jobs[('nearest', zone_id, 'shelter')] = executor.submit(find_nearest_facilities, G, ch, zone_id, 'shelter')
+
+        batches[id(G)] = PrecomputeBatch(G, jobs)
+        return batches[id(G)]
+
+@st.cache_resource(max_entries=WORKING_SET_CACHE_ENTRIES)
+def build_dashboard_map(nodes_df, supplies_pivot, rescue_teams_df, map_center):
+    """Build the main disaster zone map once per dataset"""
+    m = folium.Map(location=map_center, zoom_start=12)
+
+    # Add markers for all nodes with custom icons and colors
+    for _, row in nodes_df.iterrows():
+        color = 'red' if row['Type'] == 'affected_area' else \
+                'green' if row['Type'] == 'shelter' else \
+                'blue' if row['Type'] == 'hospital' else \
+                'orange' if row['Type'] == 'warehouse' else 'gray'
+
+        # Get supplies for this location
+        supplies = get_location_supplies(supplies_pivot, row['ID'])
+
+        popup_text = f"""
+        <b>{row['Name']}</b><br>
+        Type: {row['Type']}<br>
+        """
+        if row['Type'] in ['shelter', 'hospital']:
+            popup_text += f"Capacity: {row['Capacity']}<br>"
+        if row['Demand'] > 0:
+            popup_text += f"Current Demand: {row['Demand']}<br>"
+        if supplies:
+            popup_text += "<br>Available Supplies:<br>"
+            for supply_type in ['Water', 'Food', 'Medicine']:
+                popup_text += f"- {supply_type}: {supplies[supply_type]['stock']:,} units<br>"
+
+        folium.Marker(
+            [row['Latitude'], row['Longitude']],
+            popup=popup_text,
+            icon=folium.Icon(color=color)
+        ).add_to(m)
+
+    # Add rescue team base locations as purple markers
+    if rescue_teams_df is not None:
+        for _, team in rescue_teams_df.iterrows():
+            base_node = nodes_df[nodes_df['ID'] == team['Base_Location']]
+            if not base_node.empty:
+                lat = base_node['Latitude'].iloc[0]
+                lon = base_node['Longitude'].iloc[0]
+                folium.Marker(
+                    [lat, lon],
+                    popup=f"<b>Rescue Team {team['Team_ID']}</b><br>Speed: {team['Speed_kmph']} km/h<br>Status: {team['Availability']}",
+                    icon=folium.Icon(color='purple', icon='user', prefix='fa')
+                ).add_to(m)
+
+    return m
+
+@st.cache_resource(max_entries=WORKING_SET_CACHE_ENTRIES)
+def build_emergency_map(nodes_df, map_center):
+    """Build the emergency facilities map once per dataset"""
+    emergency_map = folium.Map(location=map_center, zoom_start=12)
+
+    # Add markers for hospitals and emergency services
+    for _, facility in nodes_df[nodes_df['Type'] == 'hospital'].iterrows():
+        folium.Marker(
+            [facility['Latitude'], facility['Longitude']],
+            popup=f"""
+            <b>{facility['Name']}</b><br>
+            Type: Hospital<br>
+            Capacity: {facility['Capacity']} beds<br>
+            Available: {facility['Capacity'] - facility['Demand']} beds
+            """,
+            icon=folium.Icon(color='red', icon='plus', prefix='fa')
+        ).add_to(emergency_map)
+
+    return emergency_map
+
+# Colors for the isochrone bands, fastest first; gray is beyond the last band
+BAND_COLORS = {15: 'green', 30: 'orange', 60: 'red', None: 'gray'}
+
+def coverage_sources(nodes_df, facility_type):
+    """Facilities of a type that can still take people; full shelters and hospitals are left out"""
+    facilities = nodes_df[nodes_df['Type'] == facility_type]
+    if facility_type in ['shelter', 'hospital']:
+        facilities = facilities[facilities['Capacity'] - facilities['Demand'] > 0]
+    return facilities['ID'].tolist()
+
+@st.cache_resource(max_entries=WORKING_SET_CACHE_ENTRIES)
+def build_base_coverage(_G, nodes_df, edges_df, facility_type):
+    """Coverage of one facility type on the unmodified network, shared by all sessions"""
+    return CoverageIndex(_G, coverage_sources(nodes_df, facility_type))
+
+def build_coverage_map(nodes_df, edges_df, coverage, map_center):
+    """Map with roads and locations colored by their isochrone band"""
+    m = folium.Map(location=map_center, zoom_start=12)
+    nodes_by_id = nodes_df.set_index('ID')
+    in_view = set(nodes_df[nodes_df['In_View']]['ID'])
+    layers = {
+        15: folium.FeatureGroup(name="Within 15 min"),
+        30: folium.FeatureGroup(name="15-30 min"),
+        60: folium.FeatureGroup(name="30-60 min"),
+        None: folium.FeatureGroup(name="Over 60 min")
+    }
+
+    # A road belongs to the band of its slower end; transit hops are not drawn
+    for _, road in edges_df.iterrows():
+        if road['Transit_Region'] or road['From'] not in in_view or road['To'] not in in_view:
+            continue
+        bands = [coverage.band(road['From']), coverage.band(road['To'])]
+        band = None if None in bands else max(bands)
+        folium.PolyLine(
+            [
+                [nodes_by_id.loc[road['From'], 'Latitude'], nodes_by_id.loc[road['From'], 'Longitude']],
+                [nodes_by_id.loc[road['To'], 'Latitude'], nodes_by_id.loc[road['To'], 'Longitude']]
+            ],
+            weight=4,
+            color=BAND_COLORS[band],
+            opacity=0.7
+        ).add_to(layers[band])
+
+    for node_id, time, nearest in zip(coverage.nodes, coverage.times(), coverage.nearest_facilities()):
+        if node_id not in in_view:
+            continue
+        node = nodes_by_id.loc[node_id]
+        popup_text = f"<b>{node['Name']}</b><br>Type: {node['Type']}<br>"
+        if nearest is None:
+            popup_text += f"No facility within {coverage.cutoff} minutes"
+        else:
+            popup_text += f"Nearest: {nodes_by_id.loc[nearest, 'Name']} ({time:.1f} min)"
+        band = coverage.band(node_id)
+        folium.CircleMarker(
+            [node['Latitude'], node['Longitude']],
+            radius=8 if node_id in coverage.sources else 5,
+            color=BAND_COLORS[band],
+            fill=True,
+            fill_opacity=0.9 if node_id in coverage.sources else 0.6,
+            popup=popup_text
+        ).add_to(layers[band])
+
+    for layer in layers.values():
+        layer.add_to(m)
+    folium.LayerControl().add_to(m)
+    return m
+
+@st.fragment
+def emergency_response_calculator(G, ch, nodes_df, supplies_pivot, precomputed):
+    """Affected area selector and nearest facility details, rerun on its own"""
+    st.subheader("Emergency Response Calculator")
+
+    # Create a dropdown for selecting affected area
+    affected_areas = nodes_df[nodes_df['Type'] == 'affected_area']
+    selected_area = st.selectbox(
+        "Select Affected Area",
+        affected_areas['ID'].tolist(),
+        format_func=lambda x: f"{nodes_df[nodes_df['ID'] == x]['Name'].iloc[0]} (Demand: {nodes_df[nodes_df['ID'] == x]['Demand'].iloc[0]})"
+    )
+
+    if selected_area:
+        st.write("---")
+
+        # Find nearest shelter
+        nearest_shelter, shelter_time, shelter_path = precomputed.result(('nearest', selected_area, 'shelter'), find_nearest_facilities, G, ch, selected_area, 'shelter')
+        if nearest_shelter:
+            shelter_info = nodes_df[nodes_df['ID'] == nearest_shelter].iloc[0]
+            shelter_supplies = get_location_supplies(supplies_pivot, nearest_shelter)
+
+            st.info(f"📍 Nearest Shelter: {shelter_info['Name']}")
+            st.write(f"Travel Time: {shelter_time:.1f} minutes")
+            st.write(f"Available Capacity: {shelter_info['Capacity'] - shelter_info['Demand']} people")
+
+            # Show route description
+            st.write("---")
+            st.write("📝 Route to Nearest Shelter")
+            route_steps = get_path_description(nodes_df, shelter_path, G)
+            for i, step in enumerate(route_steps, 1):
+                st.write(f"{i}. {step}")
+
+            if shelter_supplies:
+                st.write("Available Supplies at Shelter:")
+                for supply_type in ['Water', 'Food', 'Medicine']:
+                    st.write(
+                        f"- {supply_type}: {shelter_supplies[supply_type]['stock']:,} units "
+                        f"(Vehicle Capacity: {shelter_supplies[supply_type]['capacity']})"
+                    )
+
+        st.write("---")
+
+        # Find nearest hospital with route description
+        nearest_hospital, hospital_time, hospital_path = precomputed.result(('nearest', selected_area, 'hospital'), find_nearest_facilities, G, ch, selected_area, 'hospital')
+        if nearest_hospital:
+            hospital_info = nodes_df[nodes_df['ID'] == nearest_hospital].iloc[0]
+            hospital_supplies = get_location_supplies(supplies_pivot, nearest_hospital)
+
+            st.info(f"🏥 Nearest Hospital: {hospital_info['Name']}")
+            st.write(f"Travel Time: {hospital_time:.1f} minutes")
+            st.write(f"Available Beds: {hospital_info['Capacity'] - hospital_info['Demand']}")
+
+            # Show route description
+            st.write("---")
+            st.write("📝 Route to Nearest Hospital")
+            route_steps = get_path_description(nodes_df, hospital_path, G)
+            for i, step in enumerate(route_steps, 1):
+                st.write(f"{i}. {step}")
+
+            if hospital_supplies:
+                st.write("Medical Supplies at Hospital:")
+                for supply_type in ['Water', 'Food', 'Medicine']:
+                    st.write(
+                        f"- {supply_type}: {hospital_supplies[supply_type]['stock']:,} units "
+                        f"(Vehicle Capacity: {hospital_supplies[supply_type]['capacity']})"
+                    )
+
+        st.write("---")
+
+        # Find nearest warehouse
+        nearest_warehouse, warehouse_time, warehouse_path = precomputed.result(('nearest', selected_area, 'warehouse'), find_nearest_facilities, G, ch, selected_area, 'warehouse')
+        if nearest_warehouse:
+            warehouse_info = nodes_df[nodes_df['ID'] == nearest_warehouse].iloc[0]
+            warehouse_supplies = get_location_supplies(supplies_pivot, nearest_warehouse)
+
+            st.info(f"📦 Nearest Warehouse: {warehouse_info['Name']}")
+            st.write(f"Travel Time: {warehouse_time:.1f} minutes")
+
+            if warehouse_supplies:
+                st.write("Available Supplies at Warehouse:")
+                for supply_type in ['Water', 'Food', 'Medicine']:
+                    st.write(
+                        f"- {supply_type}: {warehouse_supplies[supply_type]['stock']:,} units "
+                        f"(Vehicle Capacity: {warehouse_supplies[supply_type]['capacity']})"
+                    )
+
+@st.fragment
+def rescue_team_allocation(G, ch, nodes_df, rescue_teams_df, disaster_zones_df, precomputed):
+    """Disaster zone selector and team dispatch details, rerun on its own"""
+    # Interactive selection of disaster zone
+    disaster_zone_options = disaster_zones_df['Location_ID'].unique().tolist()
+    selected_zone = st.selectbox(
+        "Select Disaster Zone to Allocate Rescue Team",
+        disaster_zone_options,
+        format_func=lambda x: nodes_df[nodes_df['ID'] == x]['Name'].iloc[0] if not nodes_df[nodes_df['ID'] == x].empty else x
+    )
+
+    # Allocate rescue team for the selected disaster zone only
+    allocation = precomputed.result(
+        ('allocation', selected_zone),
+        allocate_for_zone, G, ch, nodes_df, rescue_teams_df, disaster_zones_df, selected_zone
+    )
+
+    if allocation:
+        location_name = nodes_df[nodes_df['ID'] == selected_zone]['Name'].iloc[0]
+        base_location_name = nodes_df[nodes_df['ID'] == allocation['base_location']]['Name'].iloc[0]
+        st.subheader(f"Team {allocation['team_id']} → {location_name} (Severity {allocation['severity']})")
+        st.write(f"**Base Location:** {base_location_name}")
+        st.write(f"**Team Speed:** {allocation['speed']} km/h")
+        st.write(f"**Estimated Arrival Time to Disaster Zone:** {allocation['estimated_time']:.1f} minutes")
+        st.write("**Route to Disaster Zone:**")
+        route_steps = get_path_description(nodes_df, allocation['path'], G)
+        for i, step in enumerate(route_steps, 1):
+            st.write(f"{i}. {step}")
+        st.write("\n**Required Resources at Disaster Zone:**")
+        location_resources = disaster_zones_df[disaster_zones_df['Location_ID'] == selected_zone]
+        for _, resource in location_resources.iterrows():
+            st.write(f"- {resource['Resource_Type']}: {resource['Amount']} units")
+        # After reaching disaster zone, go to nearest available shelter
+        nearest_shelter, shelter_time, shelter_path = precomputed.result(('nearest', selected_zone, 'shelter'), find_nearest_facilities, G, ch, selected_zone, 'shelter')
+        if nearest_shelter:
+            shelter_name = nodes_df[nodes_df['ID'] == nearest_shelter]['Name'].iloc[0]
+            st.write("\n---")
+            st.write(f"**Next Step: Proceed to Nearest Shelter ({shelter_name})**")
+            st.write(f"Estimated Travel Time: {shelter_time:.1f} minutes")
+            st.write("**Route to Shelter:**")
+            shelter_route_steps = get_path_description(nodes_df, shelter_path, G)
+            for i, step in enumerate(shelter_route_steps, 1):
+                st.write(f"{i}. {step}")
+    else:
+        st.warning("No available rescue team for this disaster zone.")
+
+@st.fragment
+def coverage_analysis(G, nodes_df, edges_df, map_center, data_key):
+    """Isochrone bands and slow-to-reach affected areas, with what-if edits, rerun on its own"""
+    facility_type = st.selectbox(
+        "Facility Type",
+        ['hospital', 'shelter', 'warehouse'],
+        format_func=lambda x: x.title()
+    )
+    threshold = st.select_slider("Flag Affected Areas Slower Than (minutes)", COVERAGE_BANDS, value=30)
+
+    # The unmodified coverage is computed once and shared; a session only copies it on its first edit
+    base_coverage = build_base_coverage(G, nodes_df, edges_df, facility_type)
+    state_key = f"coverage_{data_key}_{facility_type}"
+    if state_key not in st.session_state:
+        st.session_state[state_key] = {'index': None, 'capacity': {}, 'map': None}
+    coverage_state = st.session_state[state_key]
+    coverage = coverage_state['index'] if coverage_state['index'] is not None else base_coverage
+
+    def edited_coverage():
+        if coverage_state['index'] is None:
+            coverage_state['index'] = copy.deepcopy(base_coverage)
+        return coverage_state['index']
+    node_name = lambda x: nodes_df[nodes_df['ID'] == x]['Name'].iloc[0]
+    # Only roads with both ends in view can be edited, the same roads the coverage map draws
+    in_view_ids = nodes_df[nodes_df['In_View']]['ID']
+    roads_df = edges_df[edges_df['From'].isin(in_view_ids) & edges_df['To'].isin(in_view_ids)]
+
+    with st.expander("What-if: Change a Facility or a Road"):
+        facility_col, road_col = st.columns(2)
+
+        with facility_col:
+            facilities = nodes_df[(nodes_df['Type'] == facility_type) & nodes_df['In_View']]
+            if facility_type in ['shelter', 'hospital'] and facilities.empty:
+                st.write(f"No {facility_type}s in view to edit.")
+            elif facility_type in ['shelter', 'hospital']:
+                facility_id = st.selectbox("Facility", facilities['ID'].tolist(), format_func=node_name)
+                facility = facilities[facilities['ID'] == facility_id].iloc[0]
+                capacity = st.number_input(
+                    f"Capacity (current demand {facility['Demand']})",
+                    min_value=0,
+                    value=int(coverage_state['capacity'].get(facility_id, facility['Capacity'])),
+                    step=10
+                )
+                if st.button("Update Capacity"):
+                    coverage_state['capacity'][facility_id] = capacity
+                    adjusted_nodes = nodes_df.copy()
+                    for changed_id, changed_capacity in coverage_state['capacity'].items():
+                        adjusted_nodes.loc[adjusted_nodes['ID'] == changed_id, 'Capacity'] = changed_capacity
+                    coverage = edited_coverage()
+                    coverage.set_sources(coverage_sources(adjusted_nodes, facility_type))
+            else:
+                st.write("Every warehouse counts towards coverage regardless of capacity.")
+
+        with road_col:
+            if roads_df.empty:
+                st.write("No roads in view to edit.")
+            else:
+                road_index = st.selectbox(
+                    "Road",
+                    list(range(len(roads_df))),
+                    format_func=lambda i: f"{node_name(roads_df.iloc[i]['From'])} – {node_name(roads_df.iloc[i]['To'])}"
+                )
+                road = roads_df.iloc[road_index]
+                closed = st.checkbox("Road Closed")
+                travel_time = st.number_input(
+                    "Travel Time (minutes)",
+                    min_value=0.1,
+                    value=float(coverage.adj[road['From']].get(road['To'], road['Travel_Time_min']))
+                )
+                if st.button("Update Road"):
+                    coverage = edited_coverage()
+                    coverage.update_road(road['From'], road['To'], None if closed else travel_time)
+
+        st.button("Reset Changes", on_click=lambda: st.session_state.pop(state_key, None))
+
+    # Only redraw the bands when the coverage actually changed
+    if coverage_state['map'] is None or coverage_state['map'][0] != coverage.version:
+        coverage_state['map'] = (coverage.version, build_coverage_map(nodes_df, edges_df, coverage, map_center))
+    folium_static(coverage_state['map'][1])
+
+    affected_areas = nodes_df[nodes_df['Type'] == 'affected_area']
+    band_cols = st.columns(len(COVERAGE_BANDS))
+    for col, minutes in zip(band_cols, COVERAGE_BANDS):
+        covered = len(affected_areas) - len(coverage.uncovered(affected_areas['ID'].tolist(), minutes))
+        col.metric(f"Affected Areas Within {minutes} min", f"{covered} / {len(affected_areas)}")
+
+    st.subheader(f"Affected Areas More Than {threshold} Minutes From Any {facility_type.title()}")
+    times = dict(zip(coverage.nodes, coverage.times()))
+    slow_areas = coverage.uncovered(affected_areas['ID'].tolist(), threshold)
+    if slow_areas:
+        slow_rows = []
+        for area_id in slow_areas:
+            area = affected_areas[affected_areas['ID'] == area_id].iloc[0]
+            nearest = coverage.nearest.get(area_id)
+            slow_rows.append({
+                'Affected Area': area['Name'],
+                'Demand': area['Demand'],
+                'Time to Nearest (min)': f"{times[area_id]:.1f}" if nearest else f"over {coverage.cutoff}",
+                'Nearest Facility': node_name(nearest) if nearest else "-"
+            })
+        st.dataframe(pd.DataFrame(slow_rows), hide_index=True)
+    else:
+        st.success(f"Every affected area is within {threshold} minutes of a {facility_type}.")
+
+# Pick the districts to load when the dataset is region-sharded
+region_store = get_region_store()
+if region_store is not None:
+    # Sorted so the same districts picked in any order share one set of cached results
+    selected_regions = tuple(sorted(st.sidebar.multiselect(
+        "Districts in View",
+        region_store.regions,
+        default=region_store.regions[:1],
+        format_func=region_store.region_name
+    )))
+    if not selected_regions:
+        st.warning("Select at least one district to view.")
+        st.stop()
+    map_center = region_store.center(selected_regions)
+else:
+    selected_regions = ()
+    map_center = DEFAULT_MAP_CENTER
+
 # Load data
-nodes_df, edges_df, supplies_df, supplies_pivot = load_data()
-rescue_teams_df, disaster_zones_df = load_rescue_data()
+nodes_df, edges_df, supplies_df, supplies_pivot = load_data(selected_regions)
+rescue_teams_df, disaster_zones_df = load_rescue_data(selected_regions)
+hospital_demand_df = load_hospital_demand(selected_regions)
 
-if all(v is not None for v in [nodes_df, edges_df, supplies_df, supplies_pivot, rescue_teams_df, disaster_zones_df]):
+if region_store is not None:
+    st.sidebar.caption("Loaded districts: " + ", ".join(region_store.region_name(r) for r in region_store.loaded_regions()))
+    st.sidebar.caption(
+        "Maps and statistics cover the districts in view. Nearest facilities, rescue teams and "
+        "coverage also count facilities and teams in the other districts, and hospital demand "
+        "counts patients from every district."
+    )
+
+if all(v is not None for v in [nodes_df, edges_df, supplies_df, supplies_pivot, rescue_teams_df, disaster_zones_df]) and \
+        (region_store is None or hospital_demand_df is not None):
     G = create_graph(nodes_df, edges_df)
-    
+
     if G is not None:
+        ch = load_contraction_hierarchy(G, nodes_df, edges_df, selected_regions)
+
+        # Statistics and maps cover the districts in view; routing also uses the overlay of the others
+        view_nodes_df = nodes_df[nodes_df['In_View']]
+        view_supplies_df = supplies_df[supplies_df['Location'].isin(view_nodes_df['ID'])]
+
+        # Queue the expensive results as soon as the graph exists so the tabs below only wait on them
+        precomputed = start_precomputation(G, ch, nodes_df, rescue_teams_df, disaster_zones_df)
+
         # Create tabs for main dashboard and emergency contacts
-        tab1, tab2, tab3 = st.tabs(["📊 Main Dashboard", "🚑 Rescue Teams", "☎️ Emergency Contacts"])
-        
+        tab1, tab2, tab3, tab4 = st.tabs(["📊 Main Dashboard", "🚑 Rescue Teams", "🗺️ Coverage", "☎️ Emergency Contacts"])
+
         with tab1:
             st.title("🚨 Disaster Management Dashboard")
-            
+
             # Create two columns
             col1, col2 = st.columns([2, 1])
-            
+
             with col1:
                 st.subheader("Disaster Zone Map")
-                m = folium.Map(location=[30.3165, 78.0322], zoom_start=12)
-                
-                # Add markers for all nodes with custom icons and colors
-                for _, row in nodes_df.iterrows():
-                    color = 'red' if row['Type'] == 'affected_area' else \
-                            'green' if row['Type'] == 'shelter' else \
-                            'blue' if row['Type'] == 'hospital' else \
-                            'orange' if row['Type'] == 'warehouse' else 'gray'
-                    
-                    # Get supplies for this location
-                    supplies = get_location_supplies(supplies_pivot, row['ID'])
-                    
-                    popup_text = f"""
-                    <b>{row['Name']}</b><br>
-                    Type: {row['Type']}<br>
-                    """
-                    if row['Type'] in ['shelter', 'hospital']:
-                        popup_text += f"Capacity: {row['Capacity']}<br>"
-                    if row['Demand'] > 0:
-                        popup_text += f"Current Demand: {row['Demand']}<br>"
-                    if supplies:
-                        popup_text += "<br>Available Supplies:<br>"
-                        for supply_type in ['Water', 'Food', 'Medicine']:
-                            popup_text += f"- {supply_type}: {supplies[supply_type]['stock']:,} units<br>"
-                    
-                    folium.Marker(
-                        [row['Latitude'], row['Longitude']],
-                        popup=popup_text,
-                        icon=folium.Icon(color=color)
-                    ).add_to(m)
-                
-                # Add rescue team base locations as purple markers
-                if rescue_teams_df is not None:
-                    for _, team in rescue_teams_df.iterrows():
-                        base_node = nodes_df[nodes_df['ID'] == team['Base_Location']]
-                        if not base_node.empty:
-                            lat = base_node['Latitude'].iloc[0]
-                            lon = base_node['Longitude'].iloc[0]
-                            folium.Marker(
-                                [lat, lon],
-                                popup=f"<b>Rescue Team {team['Team_ID']}</b><br>Speed: {team['Speed_kmph']} km/h<br>Status: {team['Availability']}",
-                                icon=folium.Icon(color='purple', icon='user', prefix='fa')
-                            ).add_to(m)
-                
-                folium_static(m)
-            
+                folium_static(build_dashboard_map(view_nodes_df, supplies_pivot, rescue_teams_df, map_center))
+
             with col2:
-                st.subheader("Emergency Response Calculator")
-                
-                # Create a dropdown for selecting affected area
-                affected_areas = nodes_df[nodes_df['Type'] == 'affected_area']
-                selected_area = st.selectbox(
-                    "Select Affected Area",
-                    affected_areas['ID'].tolist(),
-                    format_func=lambda x: f"{nodes_df[nodes_df['ID'] == x]['Name'].iloc[0]} (Demand: {nodes_df[nodes_df['ID'] == x]['Demand'].iloc[0]})"
-                )
-                
-                if selected_area:
-                    st.write("---")
-                    
-                    # Find nearest shelter
-                    nearest_shelter, shelter_time, shelter_path = find_nearest_facilities(G, selected_area, 'shelter')
-                    if nearest_shelter:
-                        shelter_info = nodes_df[nodes_df['ID'] == nearest_shelter].iloc[0]
-                        shelter_supplies = get_location_supplies(supplies_pivot, nearest_shelter)
-                        
-                        st.info(f"📍 Nearest Shelter: {shelter_info['Name']}")
-                        st.write(f"Travel Time: {shelter_time:.1f} minutes")
-                        st.write(f"Available Capacity: {shelter_info['Capacity'] - shelter_info['Demand']} people")
-                        
-                        # Show route description
-                        st.write("---")
-                        st.write("📝 Route to Nearest Shelter")
-                        route_steps = get_path_description(nodes_df, shelter_path)
-                        for i, step in enumerate(route_steps, 1):
-                            st.write(f"{i}. {step}")
-                        
-                        if shelter_supplies:
-                            st.write("Available Supplies at Shelter:")
-                            for supply_type in ['Water', 'Food', 'Medicine']:
-                                st.write(
-                                    f"- {supply_type}: {shelter_supplies[supply_type]['stock']:,} units "
-                                    f"(Vehicle Capacity: {shelter_supplies[supply_type]['capacity']})"
-                                )
-                    
-                    st.write("---")
-                    
-                    # Find nearest hospital with route description
-                    nearest_hospital, hospital_time, hospital_path = find_nearest_facilities(G, selected_area, 'hospital')
-                    if nearest_hospital:
-                        hospital_info = nodes_df[nodes_df['ID'] == nearest_hospital].iloc[0]
-                        hospital_supplies = get_location_supplies(supplies_pivot, nearest_hospital)
-                        
-                        st.info(f"🏥 Nearest Hospital: {hospital_info['Name']}")
-                        st.write(f"Travel Time: {hospital_time:.1f} minutes")
-                        st.write(f"Available Beds: {hospital_info['Capacity'] - hospital_info['Demand']}")
-                        
-                        # Show route description
-                        st.write("---")
-                        st.write("📝 Route to Nearest Hospital")
-                        route_steps = get_path_description(nodes_df, hospital_path)
-                        for i, step in enumerate(route_steps, 1):
-                            st.write(f"{i}. {step}")
-                        
-                        if hospital_supplies:
-                            st.write("Medical Supplies at Hospital:")
-                            for supply_type in ['Water', 'Food', 'Medicine']:
-                                st.write(
-                                    f"- {supply_type}: {hospital_supplies[supply_type]['stock']:,} units "
-                                    f"(Vehicle Capacity: {hospital_supplies[supply_type]['capacity']})"
-                                )
-                    
-                    st.write("---")
-                    
-                    # Find nearest warehouse
-                    nearest_warehouse, warehouse_time, warehouse_path = find_nearest_facilities(G, selected_area, 'warehouse')
-                    if nearest_warehouse:
-                        warehouse_info = nodes_df[nodes_df['ID'] == nearest_warehouse].iloc[0]
-                        warehouse_supplies = get_location_supplies(supplies_pivot, nearest_warehouse)
-                        
-                        st.info(f"📦 Nearest Warehouse: {warehouse_info['Name']}")
-                        st.write(f"Travel Time: {warehouse_time:.1f} minutes")
-                        
-                        if warehouse_supplies:
-                            st.write("Available Supplies at Warehouse:")
-                            for supply_type in ['Water', 'Food', 'Medicine']:
-                                st.write(
-                                    f"- {supply_type}: {warehouse_supplies[supply_type]['stock']:,} units "
-                                    f"(Vehicle Capacity: {warehouse_supplies[supply_type]['capacity']})"
-                                )
+                emergency_response_calculator(G, ch, nodes_df, supplies_pivot, precomputed)
 
             # Additional Statistics
             st.write("---")
             col1, col2, col3 = st.columns(3)
 
             with col1:
-                total_shelters = len(nodes_df[nodes_df['Type'] == 'shelter'])
-                available_shelter_capacity = (nodes_df[nodes_df['Type'] == 'shelter']['Capacity'] - 
-                                           nodes_df[nodes_df['Type'] == 'shelter']['Demand']).sum()
+                total_shelters = len(view_nodes_df[view_nodes_df['Type'] == 'shelter'])
+                available_shelter_capacity = (view_nodes_df[view_nodes_df['Type'] == 'shelter']['Capacity'] - 
+                                           view_nodes_df[view_nodes_df['Type'] == 'shelter']['Demand']).sum()
                 st.metric("Total Shelters", total_shelters)
                 st.metric("Available Shelter Capacity", available_shelter_capacity)
-                st.metric("Total Shelter Demand", nodes_df[nodes_df['Type'] == 'shelter']['Demand'].sum())
+                st.metric("Total Shelter Demand", view_nodes_df[view_nodes_df['Type'] == 'shelter']['Demand'].sum())
 
             with col2:
                 # Calculate hospital assignments
-                hospital_assignments, updated_demands = distribute_hospital_demands(nodes_df, G)
+                if hospital_demand_df is not None:
+                    hospital_assignments, updated_demands = saved_hospital_demands(hospital_demand_df)
+                else:
+                    hospital_assignments, updated_demands = precomputed.result('hospital_demands', distribute_hospital_demands, nodes_df, G, ch)
+                view_hospitals = view_nodes_df[view_nodes_df['Type'] == 'hospital']
                 
-                total_hospitals = len(nodes_df[nodes_df['Type'] == 'hospital'])
-                total_hospital_capacity = nodes_df[nodes_df['Type'] == 'hospital']['Capacity'].sum()
-                total_hospital_demand = sum(updated_demands.values())
+                total_hospitals = len(view_hospitals)
+                total_hospital_capacity = view_hospitals['Capacity'].sum()
+                total_hospital_demand = sum(updated_demands.get(hospital_id, 0) for hospital_id in view_hospitals['ID'])
                 
                 st.metric("Total Hospitals", total_hospitals)
                 st.metric("Total Hospital Capacity", total_hospital_capacity)
@@ -509,18 +940,30 @@ if all(v is not None for v in [nodes_df, edges_df, supplies_df, supplies_pivot,
                 st.write("---")
                 st.subheader("🏥 Hospital Demand Distribution")
                 
-                hospitals = nodes_df[nodes_df['Type'] == 'hospital']
+                # Hospitals in other districts are listed too when they take patients from this view
+                hospitals = view_hospitals[['ID', 'Name', 'Capacity']]
+                if hospital_demand_df is not None:
+                    from_view = hospital_demand_df[hospital_demand_df['Area'].isin(view_nodes_df['ID']) &
+                                                   ~hospital_demand_df['Hospital'].isin(hospitals['ID'])]
+                    hospitals = pd.concat([
+                        hospitals,
+                        from_view.drop_duplicates('Hospital').rename(columns={'Hospital': 'ID', 'Hospital_Name': 'Name'})[['ID', 'Name', 'Capacity']]
+                    ])
                 for _, hospital in hospitals.iterrows():
                     with st.expander(f"{hospital['Name']} Details"):
-                        current_demand = updated_demands[hospital['ID']]
+                        current_demand = updated_demands.get(hospital['ID'], 0)
                         available_capacity = hospital['Capacity'] - current_demand
                         
                         st.write(f"**Capacity**: {hospital['Capacity']} beds")
                         st.write(f"**Current Demand**: {current_demand} patients")
                         st.write(f"**Available Beds**: {available_capacity}")
                         
-                        if hospital_assignments[hospital['ID']]:
-                            st.write("\n**Assigned Patients from Areas:**")
+                        if hospital_assignments.get(hospital['ID']):
+                            # Only the rows of loaded districts are at hand for hospitals outside the view
+                            if hospital['ID'] in view_hospitals['ID'].values:
+                                st.write("\n**Assigned Patients from Areas:**")
+                            else:
+                                st.write("\n**Assigned Patients from Areas in View:**")
                             for assignment in hospital_assignments[hospital['ID']]:
                                 st.write(f"- {assignment['area_name']}: {assignment['assigned_demand']} patients")
                                 st.write(f"  Travel time: {assignment['travel_time']:.1f} minutes")
@@ -529,11 +972,11 @@ if all(v is not None for v in [nodes_df, edges_df, supplies_df, supplies_pivot,
 
             with col3:
                 # Calculate total supplies by type
-                total_water = supplies_df[supplies_df['Supply_Type'] == 'Water']['Stock_Level'].sum()
-                total_food = supplies_df[supplies_df['Supply_Type'] == 'Food']['Stock_Level'].sum()
-                total_medicine = supplies_df[supplies_df['Supply_Type'] == 'Medicine']['Stock_Level'].sum()
+                total_water = view_supplies_df[view_supplies_df['Supply_Type'] == 'Water']['Stock_Level'].sum()
+                total_food = view_supplies_df[view_supplies_df['Supply_Type'] == 'Food']['Stock_Level'].sum()
+                total_medicine = view_supplies_df[view_supplies_df['Supply_Type'] == 'Medicine']['Stock_Level'].sum()
                 
-                total_warehouses = len(nodes_df[nodes_df['Type'] == 'warehouse'])
+                total_warehouses = len(view_nodes_df[view_nodes_df['Type'] == 'warehouse'])
                 st.metric("Total Warehouses", total_warehouses)
                 st.write("Total Available Supplies:")
                 st.write(f"- Water: {total_water:,} units")
@@ -549,8 +992,8 @@ if all(v is not None for v in [nodes_df, edges_df, supplies_df, supplies_pivot,
             
             distribution_data = []
             for facility_type in facility_types:
-                locations = nodes_df[nodes_df['Type'].str.lower() == facility_type.lower()]['ID'].tolist()
-                facility_supplies = supplies_df[supplies_df['Location'].isin(locations)]
+                locations = view_nodes_df[view_nodes_df['Type'].str.lower() == facility_type.lower()]['ID'].tolist()
+                facility_supplies = view_supplies_df[view_supplies_df['Location'].isin(locations)]
                 
                 for supply_type in supply_types:
                     total = facility_supplies[facility_supplies['Supply_Type'] == supply_type]['Stock_Level'].sum()
@@ -571,77 +1014,13 @@ if all(v is not None for v in [nodes_df, edges_df, supplies_df, supplies_pivot,
 
         with tab2:
             st.title("🚑 Rescue Team Allocation")
-            
-            # Interactive selection of disaster zone
-            disaster_zone_options = disaster_zones_df['Location_ID'].unique().tolist()
-            selected_zone = st.selectbox(
-                "Select Disaster Zone to Allocate Rescue Team",
-                disaster_zone_options,
-                format_func=lambda x: nodes_df[nodes_df['ID'] == x]['Name'].iloc[0] if not nodes_df[nodes_df['ID'] == x].empty else x
-            )
-            
-            # Allocate rescue team for the selected disaster zone only
-            def allocate_for_zone(G, nodes_df, rescue_teams_df, zone_id):
-                available_teams = rescue_teams_df[rescue_teams_df['Availability'] == 'Available'].copy()
-                min_time = float('inf')
-                best_team = None
-                best_path = None
-                for _, team in available_teams.iterrows():
-                    try:
-                        path = nx.shortest_path(G, team['Base_Location'], zone_id, weight='weight')
-                        time = sum(G[path[i]][path[i+1]]['weight'] for i in range(len(path)-1))
-                        time = time * (50 / team['Speed_kmph'])
-                        if time < min_time:
-                            min_time = time
-                            best_team = team
-                            best_path = path
-                    except nx.NetworkXNoPath:
-                        continue
-                if best_team is not None:
-                    severity = disaster_zones_df[disaster_zones_df['Location_ID'] == zone_id]['Severity_Level'].max()
-                    return {
-                        'team_id': best_team['Team_ID'],
-                        'severity': severity,
-                        'estimated_time': min_time,
-                        'path': best_path,
-                        'base_location': best_team['Base_Location'],
-                        'speed': best_team['Speed_kmph']
-                    }
-                else:
-                    return None
-            
-            allocation = allocate_for_zone(G, nodes_df, rescue_teams_df, selected_zone)
-            
-            if allocation:
-                location_name = nodes_df[nodes_df['ID'] == selected_zone]['Name'].iloc[0]
-                base_location_name = nodes_df[nodes_df['ID'] == allocation['base_location']]['Name'].iloc[0]
-                st.subheader(f"Team {allocation['team_id']} → {location_name} (Severity {allocation['severity']})")
-                st.write(f"**Base Location:** {base_location_name}")
-                st.write(f"**Team Speed:** {allocation['speed']} km/h")
-                st.write(f"**Estimated Arrival Time to Disaster Zone:** {allocation['estimated_time']:.1f} minutes")
-                st.write("**Route to Disaster Zone:**")
-                route_steps = get_path_description(nodes_df, allocation['path'])
-                for i, step in enumerate(route_steps, 1):
-                    st.write(f"{i}. {step}")
-                st.write("\n**Required Resources at Disaster Zone:**")
-                location_resources = disaster_zones_df[disaster_zones_df['Location_ID'] == selected_zone]
-                for _, resource in location_resources.iterrows():
-                    st.write(f"- {resource['Resource_Type']}: {resource['Amount']} units")
-                # After reaching disaster zone, go to nearest available shelter
-                nearest_shelter, shelter_time, shelter_path = find_nearest_facilities(G, selected_zone, 'shelter')
-                if nearest_shelter:
-                    shelter_name = nodes_df[nodes_df['ID'] == nearest_shelter]['Name'].iloc[0]
-                    st.write("\n---")
-                    st.write(f"**Next Step: Proceed to Nearest Shelter ({shelter_name})**")
-                    st.write(f"Estimated Travel Time: {shelter_time:.1f} minutes")
-                    st.write("**Route to Shelter:**")
-                    shelter_route_steps = get_path_description(nodes_df, shelter_path)
-                    for i, step in enumerate(shelter_route_steps, 1):
-                        st.write(f"{i}. {step}")
-            else:
-                st.warning("No available rescue team for this disaster zone.")
+            rescue_team_allocation(G, ch, nodes_df, rescue_teams_df, disaster_zones_df, precomputed)
 
         with tab3:
+            st.title("🗺️ Facility Coverage")
+            coverage_analysis(G, nodes_df, edges_df, map_center, "_".join(selected_regions))
+
+        with tab4:
             st.title("☎️ Emergency Contacts")
             
             # Create single column for emergency contacts
@@ -663,22 +1042,7 @@ if all(v is not None for v in [nodes_df, edges_df, supplies_df, supplies_pivot,
 
             # Add a map showing all emergency facilities
             st.subheader("🗺️ Emergency Facilities Map")
-            emergency_map = folium.Map(location=[30.3165, 78.0322], zoom_start=12)
-            
-            # Add markers for hospitals and emergency services
-            for _, facility in nodes_df[nodes_df['Type'] == 'hospital'].iterrows():
-                folium.Marker(
-                    [facility['Latitude'], facility['Longitude']],
-                    popup=f"""
-                    <b>{facility['Name']}</b><br>
-                    Type: Hospital<br>
-                    Capacity: {facility['Capacity']} beds<br>
-                    Available: {facility['Capacity'] - facility['Demand']} beds
-                    """,
-                    icon=folium.Icon(color='red', icon='plus', prefix='fa')
-                ).add_to(emergency_map)
-            
-            folium_static(emergency_map)
+            folium_static(build_emergency_map(view_nodes_df, map_center))
             
             # Emergency Guidelines
             st.write("---")
@@ -0,0 +1,317 @@
+"""Contraction hierarchy over the road network's Travel_Time_min weights.
+
+Run this file directly to preprocess the dataset once:
+
+    python contraction_hierarchy.py [nodes.txt] [edges.txt]
+
+It writes ch_nodes.txt (node ranks) and ch_edges.txt (original roads plus
+shortcuts) next to the edge file. The dashboard loads those files when they
+still match the road network and otherwise builds the hierarchy in memory.
+"""
+import heapq
+import os
+import sys
+
+import networkx as nx
+import pandas as pd
+
+# Witness searches only need to prove that a shortcut is unnecessary, so they
+# are cut off early to keep preprocessing fast on large networks
+WITNESS_SETTLE_LIMIT = 50
+
+
+def _pair(u, v):
+    """Order-independent key for an undirected road"""
+    return (u, v) if u <= v else (v, u)
+
+
+class ContractionHierarchy:
+    """Upward search graph plus the shortcut middles needed to unpack paths"""
+
+    def __init__(self, rank, up, via, original):
+        self.rank = rank
+        self.up = up
+        self.via = via
+        self.original = original
+        self._bucket_cache = {}
+
+    @classmethod
+    def build(cls, G, weight='weight'):
+        """Contract every node of G in order of edge difference"""
+        adj = {node: {} for node in G.nodes}
+        original = {}
+        for u, v, w in G.edges(data=weight):
+            if u == v:
+                continue
+            adj[u][v] = w
+            adj[v][u] = w
+            original[_pair(u, v)] = w
+
+        via = {}
+        rank = {}
+        up = {}
+        contracted_neighbours = {node: 0 for node in adj}
+
+        def shortcuts_for(node):
+            """Shortcuts needed if node were contracted now"""
+            neighbours = list(adj[node].items())
+            needed = []
+            for i, (u, w_u) in enumerate(neighbours):
+                targets = {v: w_u + w_v for v, w_v in neighbours[i + 1:]}
+                if not targets:
+                    continue
+                witness = _witness_search(adj, u, node, targets, max(targets.values()))
+                for v, through in targets.items():
+                    if witness.get(v, float('inf')) > through:
+                        needed.append((u, v, through))
+            return needed
+
+        def priority(node):
+            return len(shortcuts_for(node)) - len(adj[node]) + contracted_neighbours[node]
+
+        queue = [(priority(node), node) for node in adj]
+        heapq.heapify(queue)
+
+        while queue:
+            _, node = heapq.heappop(queue)
+            if node in rank:
+                continue
+            # Lazy update: re-check the priority and put it back if it got worse
+            current = priority(node)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, node))
+                continue
+
+            for u, v, through in shortcuts_for(node):
+                if through < adj[u].get(v, float('inf')):
+                    adj[u][v] = through
+                    adj[v][u] = through
+                    via[_pair(u, v)] = node
+
+            rank[node] = len(rank)
+            up[node] = dict(adj[node])
+            for neighbour in adj[node]:
+                del adj[neighbour][node]
+                contracted_neighbours[neighbour] += 1
+            adj[node] = {}
+
+        return cls(rank, up, via, original)
+
+    @classmethod
+    def load(cls, ch_nodes_file, ch_edges_file):
+        """Read a hierarchy written by save()"""
+        ch_nodes_df = pd.read_csv(ch_nodes_file)
+        ch_edges_df = pd.read_csv(ch_edges_file, keep_default_na=False)
+
+        rank = dict(zip(ch_nodes_df['ID'], ch_nodes_df['Rank']))
+        # Via is read as text so that '' marks an original road; map it back to the node IDs
+        node_ids = {str(node): node for node in rank}
+        up = {node: {} for node in rank}
+        via = {}
+        original = {}
+        for row in ch_edges_df.itertuples(index=False):
+            low, high = (row.From, row.To) if rank[row.From] < rank[row.To] else (row.To, row.From)
+            weight = row.Travel_Time_min
+            if row.Via == '':
+                original[_pair(low, high)] = weight
+            # Keep the cheaper arc when a shortcut beats the direct road
+            if weight < up[low].get(high, float('inf')):
+                up[low][high] = weight
+                if row.Via == '':
+                    via.pop(_pair(low, high), None)
+                else:
+                    via[_pair(low, high)] = node_ids[row.Via]
+        return cls(rank, up, via, original)
+
+    def save(self, ch_nodes_file, ch_edges_file):
+        """Write node ranks and all arcs (roads and shortcuts) as CSV"""
+        pd.DataFrame(
+            sorted(self.rank.items(), key=lambda item: item[1]),
+            columns=['ID', 'Rank']
+        ).to_csv(ch_nodes_file, index=False)
+
+        rows = [(u, v, w, '') for (u, v), w in self.original.items()]
+        for node, arcs in self.up.items():
+            for neighbour, w in arcs.items():
+                middle = self.via.get(_pair(node, neighbour))
+                if middle is not None:
+                    rows.append((node, neighbour, w, middle))
+        pd.DataFrame(rows, columns=['From', 'To', 'Travel_Time_min', 'Via']).to_csv(ch_edges_file, index=False)
+
+    def matches(self, G, weight='weight'):
+        """Check that the hierarchy was built from exactly this road network"""
+        if set(self.rank) != set(G.nodes):
+            return False
+        roads = {_pair(u, v): w for u, v, w in G.edges(data=weight) if u != v}
+        return roads == self.original
+
+    def _upward_search(self, source):
+        """Plain Dijkstra restricted to arcs leading to higher-ranked nodes"""
+        dist = {source: 0}
+        parent = {source: None}
+        heap = [(0, source)]
+        settled = []
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            settled.append(node)
+            for neighbour, w in self.up[node].items():
+                nd = d + w
+                if nd < dist.get(neighbour, float('inf')):
+                    dist[neighbour] = nd
+                    parent[neighbour] = node
+                    heapq.heappush(heap, (nd, neighbour))
+        return dist, parent, settled
+
+    def _unpack_arc(self, u, v):
+        """Expand a (possibly shortcut) arc into the original road sequence u..v"""
+        middle = self.via.get(_pair(u, v))
+        if middle is None:
+            return [u, v]
+        return self._unpack_arc(u, middle)[:-1] + self._unpack_arc(middle, v)
+
+    def _unpack(self, meeting, forward_parent, backward_parent):
+        """Join the two upward half paths at the meeting node and unpack shortcuts"""
+        up_path = []
+        node = meeting
+        while node is not None:
+            up_path.append(node)
+            node = forward_parent[node]
+        up_path.reverse()
+        node = backward_parent[meeting]
+        while node is not None:
+            up_path.append(node)
+            node = backward_parent[node]
+
+        path = [up_path[0]]
+        for u, v in zip(up_path, up_path[1:]):
+            path.extend(self._unpack_arc(u, v)[1:])
+        return path
+
+    def shortest_path(self, source, target):
+        """Point-to-point travel time and road path, or (inf, []) if unreachable"""
+        if source not in self.rank or target not in self.rank:
+            return float('inf'), []
+        if source == target:
+            return 0, [source]
+
+        dist = ({source: 0}, {target: 0})
+        parent = ({source: None}, {target: None})
+        heaps = ([(0, source)], [(0, target)])
+        best, meeting = float('inf'), None
+
+        # Alternate the two upward searches until neither can improve on the best meeting
+        while heaps[0] or heaps[1]:
+            for side in (0, 1):
+                if not heaps[side]:
+                    continue
+                d, node = heapq.heappop(heaps[side])
+                if d > dist[side][node]:
+                    continue
+                if d >= best:
+                    heaps[side].clear()
+                    continue
+                other = dist[1 - side].get(node)
+                if other is not None and d + other < best:
+                    best, meeting = d + other, node
+                for neighbour, w in self.up[node].items():
+                    nd = d + w
+                    if nd < dist[side].get(neighbour, float('inf')):
+                        dist[side][neighbour] = nd
+                        parent[side][neighbour] = node
+                        heapq.heappush(heaps[side], (nd, neighbour))
+
+        if meeting is None:
+            return float('inf'), []
+        return best, self._unpack(meeting, parent[0], parent[1])
+
+    def _buckets(self, targets):
+        """Backward upward searches from every target, grouped by the node they reach"""
+        key = tuple(targets)
+        if key not in self._bucket_cache:
+            buckets = {}
+            parents = {}
+            for target in targets:
+                if target not in self.rank:
+                    continue
+                dist, parent, settled = self._upward_search(target)
+                parents[target] = parent
+                for node in settled:
+                    buckets.setdefault(node, []).append((target, dist[node]))
+            self._bucket_cache[key] = (buckets, parents)
+        return self._bucket_cache[key]
+
+    def one_to_many(self, source, targets):
+        """Travel time and road path from source to each reachable target
+
+        Returns {target: (time, path)}. Buckets for a target list are kept,
+        so repeated queries against the same facilities only pay for the
+        forward search.
+        """
+        if source not in self.rank:
+            return {}
+        buckets, parents = self._buckets(targets)
+        dist, parent, settled = self._upward_search(source)
+
+        best = {}
+        for node in settled:
+            for target, target_dist in buckets.get(node, []):
+                total = dist[node] + target_dist
+                if total < best.get(target, (float('inf'), None))[0]:
+                    best[target] = (total, node)
+
+        return {
+            target: (total, self._unpack(meeting, parent, parents[target]))
+            for target, (total, meeting) in best.items()
+        }
+
+
+def _witness_search(adj, source, skip, targets, limit):
+    """Bounded Dijkstra from source that ignores the node being contracted"""
+    dist = {source: 0}
+    heap = [(0, source)]
+    remaining = set(targets)
+    settled = 0
+    while heap and remaining and settled < WITNESS_SETTLE_LIMIT:
+        d, node = heapq.heappop(heap)
+        if d > dist[node]:
+            continue
+        if d > limit:
+            break
+        remaining.discard(node)
+        settled += 1
+        for neighbour, w in adj[node].items():
+            if neighbour == skip:
+                continue
+            nd = d + w
+            if nd < dist.get(neighbour, float('inf')):
+                dist[neighbour] = nd
+                heapq.heappush(heap, (nd, neighbour))
+    return dist
+
+
+def ch_files_for(edges_file):
+    """Locations of the saved hierarchy for a given edge file"""
+    directory = os.path.dirname(edges_file)
+    return os.path.join(directory, 'ch_nodes.txt'), os.path.join(directory, 'ch_edges.txt')
+
+
+def road_graph(nodes_df, edges_df):
+    """Travel-time graph in the same shape as the dashboard's network graph"""
+    G = nx.Graph()
+    G.add_nodes_from(nodes_df['ID'])
+    for row in edges_df.itertuples(index=False):
+        G.add_edge(row.From, row.To, weight=row.Travel_Time_min)
+    return G
+
+
+if __name__ == '__main__':
+    nodes_file = sys.argv[1] if len(sys.argv) > 1 else 'nodes.txt'
+    edges_file = sys.argv[2] if len(sys.argv) > 2 else 'edges.txt'
+
+    G = road_graph(pd.read_csv(nodes_file), pd.read_csv(edges_file))
+    ch = ContractionHierarchy.build(G)
+    ch_nodes_file, ch_edges_file = ch_files_for(edges_file)
+    ch.save(ch_nodes_file, ch_edges_file)
+    print(f"Contracted {len(ch.rank)} nodes with {len(ch.via)} shortcuts -> {ch_nodes_file}, {ch_edges_file}")
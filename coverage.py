@@ -0,0 +1,157 @@
+"""Facility coverage: travel time from every node to its nearest facility.
+
+A CoverageIndex runs one bounded multi-source Dijkstra from all facilities of
+a type at once and keeps the resulting shortest-path forest. When a facility
+is opened or closed, or a road's travel time changes, only the part of the
+forest that depends on it is recomputed.
+"""
+import heapq
+
+import numpy as np
+
+# Isochrone bands in minutes; anything slower than the last band counts as uncovered
+COVERAGE_BANDS = [15, 30, 60]
+
+
+class CoverageIndex:
+    """Time-to-nearest-facility for every node, bounded by a cutoff"""
+
+    def __init__(self, G, sources, cutoff=COVERAGE_BANDS[-1], weight='weight'):
+        self.nodes = list(G.nodes)
+        self.cutoff = cutoff
+        # Own copy of the road weights so what-if edits never touch the shared graph
+        self.adj = {node: {} for node in self.nodes}
+        for u, v, w in G.edges(data=weight):
+            self.adj[u][v] = w
+            self.adj[v][u] = w
+
+        self.sources = set()
+        self.dist = {}
+        self.parent = {}
+        self.nearest = {}
+        self.children = {node: set() for node in self.nodes}
+        self.version = 0
+        self.set_sources(sources)
+
+    def times(self):
+        """Minutes to the nearest facility, aligned with self.nodes (inf beyond the cutoff)"""
+        return np.array([self.dist.get(node, np.inf) for node in self.nodes], dtype=float)
+
+    def nearest_facilities(self):
+        """Nearest facility per node, aligned with self.nodes (None beyond the cutoff)"""
+        return [self.nearest.get(node) for node in self.nodes]
+
+    def band(self, node):
+        """Smallest band that covers the node, or None if it is beyond every band"""
+        time = self.dist.get(node, np.inf)
+        for minutes in COVERAGE_BANDS:
+            if time <= minutes:
+                return minutes
+        return None
+
+    def uncovered(self, candidates, minutes):
+        """Candidates that are more than the given minutes from any facility"""
+        return [node for node in candidates if self.dist.get(node, np.inf) > minutes]
+
+    def set_sources(self, sources):
+        """Open and close facilities so that exactly these nodes are sources"""
+        sources = {node for node in sources if node in self.adj}
+        removed = self.sources - sources
+        added = sources - self.sources
+        if removed:
+            self.sources -= removed
+            self._invalidate(removed)
+        if added:
+            self.sources |= added
+            heap = []
+            for node in added:
+                self._set(node, 0, None, node)
+                heap.append((0, node))
+            self._propagate(heap)
+        self.version += 1
+
+    def update_road(self, u, v, travel_time):
+        """Change a road's travel time; None closes the road"""
+        old = self.adj[u].get(v)
+        if travel_time is None:
+            self.adj[u].pop(v, None)
+            self.adj[v].pop(u, None)
+        else:
+            self.adj[u][v] = travel_time
+            self.adj[v][u] = travel_time
+
+        if old is not None and (travel_time is None or travel_time > old):
+            # Slower road: only nodes reached through it can get worse
+            for parent, child in ((u, v), (v, u)):
+                if self.parent.get(child) == parent:
+                    self._invalidate([child])
+        elif travel_time is not None:
+            # Faster or new road: relax it from both ends
+            heap = []
+            for a, b in ((u, v), (v, u)):
+                if a in self.dist:
+                    candidate = self.dist[a] + travel_time
+                    if candidate <= self.cutoff and candidate < self.dist.get(b, np.inf):
+                        self._set(b, candidate, a, self.nearest[a])
+                        heap.append((candidate, b))
+            self._propagate(heap)
+        self.version += 1
+
+    def _set(self, node, dist, parent, nearest):
+        old_parent = self.parent.get(node)
+        if old_parent is not None:
+            self.children[old_parent].discard(node)
+        self.dist[node] = dist
+        self.parent[node] = parent
+        self.nearest[node] = nearest
+        if parent is not None:
+            self.children[parent].add(node)
+
+    def _propagate(self, heap):
+        """Dijkstra from the given frontier, only ever lowering distances"""
+        heapq.heapify(heap)
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > self.dist.get(node, np.inf):
+                continue
+            for neighbour, w in self.adj[node].items():
+                nd = d + w
+                if nd <= self.cutoff and nd < self.dist.get(neighbour, np.inf):
+                    self._set(neighbour, nd, node, self.nearest[node])
+                    heapq.heappush(heap, (nd, neighbour))
+
+    def _invalidate(self, roots):
+        """Drop the subtrees under roots from the forest and reconnect them from their valid neighbours"""
+        invalid = set()
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node in invalid or node not in self.dist:
+                continue
+            invalid.add(node)
+            stack.extend(self.children[node])
+
+        for node in invalid:
+            parent = self.parent.pop(node)
+            if parent is not None:
+                self.children[parent].discard(node)
+            del self.dist[node]
+            del self.nearest[node]
+        for node in invalid:
+            self.children[node] = set()
+
+        heap = []
+        for node in invalid:
+            if node in self.sources:
+                self._set(node, 0, None, node)
+                heap.append((0, node))
+                continue
+            for neighbour, w in self.adj[node].items():
+                if neighbour in invalid or neighbour not in self.dist:
+                    continue
+                candidate = self.dist[neighbour] + w
+                if candidate <= self.cutoff and candidate < self.dist.get(node, np.inf):
+                    self._set(node, candidate, neighbour, self.nearest[neighbour])
+            if node in self.dist:
+                heap.append((self.dist[node], node))
+        self._propagate(heap)
@@ -0,0 +1,59 @@
+"""Distribution of affected-area patients over hospitals.
+
+Shared by the dashboard and by regions.py, which runs it over the whole
+state when splitting a dataset so that every district sees the same beds.
+"""
+
+
+def distribute_hospital_demands(nodes_df, G, ch):
+    """Distribute demands from affected areas to nearby hospitals based on proximity and capacity"""
+    # Get affected areas and hospitals
+    affected_areas = nodes_df[nodes_df['Type'] == 'affected_area'].copy()
+    hospitals = nodes_df[nodes_df['Type'] == 'hospital'].copy()
+    
+    # Create a dictionary to store hospital assignments
+    hospital_assignments = {hospital['ID']: [] for _, hospital in hospitals.iterrows()}
+    updated_demands = {hospital['ID']: 0 for _, hospital in hospitals.iterrows()}
+    
+    # For each affected area, distribute demand to nearest hospitals
+    for _, area in affected_areas.iterrows():
+        if area['Demand'] > 0:
+            area_demand = area['Demand']
+            hospital_distances = []
+            
+            # Calculate distances to all hospitals
+            routes = ch.one_to_many(area['ID'], hospitals['ID'].tolist())
+            for _, hospital in hospitals.iterrows():
+                if hospital['ID'] not in routes:
+                    continue
+                travel_time, _ = routes[hospital['ID']]
+                available_capacity = hospital['Capacity'] - updated_demands[hospital['ID']]
+                
+                if available_capacity > 0:
+                    hospital_distances.append({
+                        'hospital_id': hospital['ID'],
+                        'travel_time': travel_time,
+                        'available_capacity': available_capacity
+                    })
+            
+            # Sort hospitals by travel time
+            hospital_distances.sort(key=lambda x: x['travel_time'])
+            
+            # Distribute demand among hospitals
+            remaining_demand = area_demand
+            for hospital in hospital_distances:
+                if remaining_demand <= 0:
+                    break
+                    
+                assignable_demand = min(remaining_demand, hospital['available_capacity'])
+                if assignable_demand > 0:
+                    hospital_assignments[hospital['hospital_id']].append({
+                        'area_id': area['ID'],
+                        'area_name': area['Name'],
+                        'assigned_demand': assignable_demand,
+                        'travel_time': hospital['travel_time']
+                    })
+                    updated_demands[hospital['hospital_id']] += assignable_demand
+                    remaining_demand -= assignable_demand
+    
+    return hospital_assignments, updated_demands
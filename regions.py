@@ -0,0 +1,331 @@
+"""Region-sharded datasets for covering several districts.
+
+Layout of a sharded dataset directory:
+
+    regions.txt                    Region,Name,Latitude,Longitude,Nodes,Edges
+    overlay_nodes.txt              boundary nodes and transit hop targets, plus Region
+    overlay_edges.txt              inter-district roads and per-region transit hops
+    overlay_relief_supplies.txt    supplies held at overlay nodes, plus Region
+    overlay_rescue_teams.txt       rescue teams based at overlay nodes, plus Region
+    <Region>/nodes.txt             the usual data files, one set per region
+    <Region>/edges.txt
+    ...
+    <Region>/hospital_demand.txt   statewide hospital assignments touching the region
+
+Boundary nodes are the ends of roads into another region. A transit hop is
+the shortest in-region route from a boundary node to another node of the same
+region. Each boundary node gets hops to:
+
+    - the other boundary nodes of its region
+    - the nearest facility of each type, and the nearest shelter and
+      hospital that still has room
+    - the team bases whose fastest available team no nearer base outpaces
+
+A route that ends inside an unloaded region enters it for the last time
+through some boundary node, so the best facility or team it can reach there
+is one of these targets. Nearest-facility, coverage and team answers
+therefore stay exact while the overlay only grows with the boundaries.
+
+Hospital demand is a greedy allocation over every affected area, so it is
+computed once over the whole state while splitting. Each region keeps the
+rows whose hospital or affected area lies in it.
+
+Build one from the flat files with:
+
+    python regions.py split districts.csv [output_dir]
+
+where districts.csv lists Region,Name,Latitude,Longitude for each district
+and every node goes to the district whose center is closest.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import networkx as nx
+import pandas as pd
+from geopy.distance import geodesic
+
+from contraction_hierarchy import ContractionHierarchy, road_graph
+from hospital_demand import distribute_hospital_demands
+
+SHARD_FILES = ['nodes', 'edges', 'relief_supplies', 'rescue_teams', 'disaster_zones']
+
+HOSPITAL_DEMAND_COLUMNS = [
+    'Hospital', 'Hospital_Name', 'Capacity', 'Hospital_Demand',
+    'Area', 'Area_Name', 'Assigned_Demand', 'Travel_Time_min'
+]
+
+# Node types that stay queryable when their region is not loaded
+FACILITY_TYPES = ['shelter', 'hospital', 'warehouse']
+
+# Facilities of these types stop taking people once demand reaches capacity
+CAPACITY_TYPES = ['shelter', 'hospital']
+
+# Column holding the node ID that decides which region a row belongs to
+LOCATION_COLUMNS = {
+    'nodes': 'ID',
+    'relief_supplies': 'Location',
+    'rescue_teams': 'Base_Location',
+    'disaster_zones': 'Location_ID'
+}
+
+
+class RegionShard:
+    """All data files of one region"""
+
+    def __init__(self, region, frames):
+        self.region = region
+        self.frames = frames
+        self.nbytes = sum(int(df.memory_usage(deep=True).sum()) for df in frames.values())
+
+
+class RegionStore:
+    """Loads region shards on demand and keeps the recently used ones within a memory budget
+
+    The budget counts the shard data frames as read from disk; working sets
+    and anything built from them are cached by the caller.
+    """
+
+    def __init__(self, root, memory_budget_mb=256):
+        self.root = root
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.index = pd.read_csv(os.path.join(root, 'regions.txt'))
+        self.overlay = {
+            name: pd.read_csv(os.path.join(root, f'overlay_{name}.txt'), keep_default_na=False)
+            for name in ['nodes', 'edges', 'relief_supplies', 'rescue_teams']
+        }
+        self._shards = OrderedDict()
+        self._loaded_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def regions(self):
+        return self.index['Region'].tolist()
+
+    def region_name(self, region):
+        return self.index[self.index['Region'] == region]['Name'].iloc[0]
+
+    def center(self, regions):
+        """Average of the region centers, used to place the map"""
+        selected = self.index[self.index['Region'].isin(regions)]
+        return [selected['Latitude'].mean(), selected['Longitude'].mean()]
+
+    def get(self, region):
+        """Shard for a region, read from disk only if it is not already cached"""
+        with self._lock:
+            if region in self._shards:
+                self._shards.move_to_end(region)
+                return self._shards[region]
+
+            directory = os.path.join(self.root, region)
+            frames = {
+                name: pd.read_csv(os.path.join(directory, f'{name}.txt'))
+                for name in SHARD_FILES + ['hospital_demand']
+            }
+            shard = RegionShard(region, frames)
+            self._shards[region] = shard
+            self._loaded_bytes += shard.nbytes
+
+            # Evict least recently used shards, but never the one just asked for
+            while self._loaded_bytes > self.memory_budget and len(self._shards) > 1:
+                _, evicted = self._shards.popitem(last=False)
+                self._loaded_bytes -= evicted.nbytes
+            return shard
+
+    def loaded_regions(self):
+        with self._lock:
+            return list(self._shards)
+
+    def working_set(self, regions):
+        """Data frames for the given regions joined through the overlay
+
+        Nodes get an In_View flag and edges a Transit_Region column ('' for
+        real roads). Overlay nodes of the other regions are added out of
+        view: facilities keep their type, capacity and supplies, the rest
+        become type 'boundary'. Transit hops stand in for the roads inside
+        regions that are not loaded. hospital_demand holds the statewide
+        assignments of the loaded hospitals and affected areas.
+        """
+        regions = list(regions)
+        shards = [self.get(region) for region in regions]
+        frames = {
+            name: pd.concat([shard.frames[name] for shard in shards], ignore_index=True)
+            for name in SHARD_FILES + ['hospital_demand']
+        }
+        # Rows between two loaded regions are stored in both shards
+        frames['hospital_demand'] = frames['hospital_demand'].drop_duplicates(['Hospital', 'Area'], ignore_index=True)
+        frames['nodes']['In_View'] = True
+        frames['edges']['Transit_Region'] = ''
+
+        outside = self.overlay['nodes'][~self.overlay['nodes']['Region'].isin(regions)].copy()
+        outside['In_View'] = False
+        not_facility = ~outside['Type'].isin(FACILITY_TYPES)
+        outside.loc[not_facility, 'Type'] = 'boundary'
+        outside.loc[not_facility, 'Capacity'] = 0
+        outside.loc[not_facility, 'Demand'] = 0
+
+        overlay_edges = self.overlay['edges'][
+            (self.overlay['edges']['Transit_Region'] == '') |
+            (~self.overlay['edges']['Transit_Region'].isin(regions))
+        ]
+        for name, extra in [('nodes', outside), ('edges', overlay_edges)] + [
+            (name, self.overlay[name][~self.overlay[name]['Region'].isin(regions)])
+            for name in ['relief_supplies', 'rescue_teams']
+        ]:
+            frames[name] = pd.concat([frames[name], extra[frames[name].columns]], ignore_index=True)
+        return frames
+
+
+def assign_regions(nodes_df, districts_df):
+    """Region of every node: the district whose center is closest"""
+    centers = list(zip(districts_df['Region'], districts_df['Latitude'], districts_df['Longitude']))
+    assignment = {}
+    for _, node in nodes_df.iterrows():
+        position = (node['Latitude'], node['Longitude'])
+        assignment[node['ID']] = min(centers, key=lambda c: geodesic(position, (c[1], c[2])).km)[0]
+    return assignment
+
+
+def split_dataset(frames, districts_df, output_dir):
+    """Write one shard per district plus the overlay"""
+    nodes_df, edges_df = frames['nodes'], frames['edges']
+    assignment = assign_regions(nodes_df, districts_df)
+    from_region = edges_df['From'].map(assignment)
+    to_region = edges_df['To'].map(assignment)
+
+    crossing = edges_df[from_region != to_region]
+    boundary_ids = set(crossing['From']) | set(crossing['To'])
+    index_rows = []
+    overlay_edges = [crossing.assign(Transit_Region='')]
+    hospital_demand = statewide_hospital_demand(nodes_df, edges_df)
+
+    for _, district in districts_df.iterrows():
+        region = district['Region']
+        directory = os.path.join(output_dir, region)
+        os.makedirs(directory, exist_ok=True)
+
+        shard = {}
+        for name in SHARD_FILES:
+            df = frames[name]
+            if name == 'edges':
+                shard[name] = df[(from_region == region) & (to_region == region)]
+            else:
+                shard[name] = df[df[LOCATION_COLUMNS[name]].map(assignment) == region]
+            shard[name].to_csv(os.path.join(directory, f'{name}.txt'), index=False)
+        hospital_demand[
+            (hospital_demand['Hospital'].map(assignment) == region) |
+            (hospital_demand['Area'].map(assignment) == region)
+        ].to_csv(os.path.join(directory, 'hospital_demand.txt'), index=False)
+
+        index_rows.append({
+            'Region': region,
+            'Name': district['Name'],
+            'Latitude': district['Latitude'],
+            'Longitude': district['Longitude'],
+            'Nodes': len(shard['nodes']),
+            'Edges': len(shard['edges'])
+        })
+        overlay_edges.append(transit_edges(region, shard, boundary_ids))
+
+    pd.DataFrame(index_rows).to_csv(os.path.join(output_dir, 'regions.txt'), index=False)
+    overlay_edges = pd.concat(overlay_edges, ignore_index=True)
+    overlay_edges.to_csv(os.path.join(output_dir, 'overlay_edges.txt'), index=False)
+
+    overlay_ids = boundary_ids | set(overlay_edges['To'])
+    overlay_frames = {
+        'nodes': nodes_df[nodes_df['ID'].isin(overlay_ids)],
+        'relief_supplies': frames['relief_supplies'][frames['relief_supplies']['Location'].isin(overlay_ids)],
+        'rescue_teams': frames['rescue_teams'][frames['rescue_teams']['Base_Location'].isin(overlay_ids)]
+    }
+    for name, df in overlay_frames.items():
+        df = df.assign(Region=df[LOCATION_COLUMNS[name]].map(assignment))
+        df.to_csv(os.path.join(output_dir, f'overlay_{name}.txt'), index=False)
+
+
+def statewide_hospital_demand(nodes_df, edges_df):
+    """Hospital assignments over the whole state, one row per hospital and affected area"""
+    G = road_graph(nodes_df, edges_df)
+    hospital_assignments, updated_demands = distribute_hospital_demands(nodes_df, G, ContractionHierarchy.build(G))
+    hospitals = nodes_df.set_index('ID')
+    rows = [
+        {
+            'Hospital': hospital_id,
+            'Hospital_Name': hospitals.loc[hospital_id, 'Name'],
+            'Capacity': hospitals.loc[hospital_id, 'Capacity'],
+            'Hospital_Demand': updated_demands[hospital_id],
+            'Area': assignment['area_id'],
+            'Area_Name': assignment['area_name'],
+            'Assigned_Demand': assignment['assigned_demand'],
+            'Travel_Time_min': assignment['travel_time']
+        }
+        for hospital_id, assignments in hospital_assignments.items()
+        for assignment in assignments
+    ]
+    return pd.DataFrame(rows, columns=HOSPITAL_DEMAND_COLUMNS)
+
+
+def hop_targets(times, region_nodes, region_teams, boundary_ids):
+    """Nodes a boundary node needs a transit hop to, given its in-region travel times"""
+    reachable = region_nodes[region_nodes['ID'].isin(times.keys())]
+    nearest = lambda df: [min(df['ID'], key=times.get)] if not df.empty else []
+
+    targets = [node for node in reachable['ID'] if node in boundary_ids]
+    for facility_type in FACILITY_TYPES:
+        facilities = reachable[reachable['Type'] == facility_type]
+        targets += nearest(facilities)
+        if facility_type in CAPACITY_TYPES:
+            targets += nearest(facilities[facilities['Capacity'] - facilities['Demand'] > 0])
+
+    # A base is only worth a hop if its fastest team beats every nearer base
+    available = region_teams[(region_teams['Availability'] == 'Available') &
+                             region_teams['Base_Location'].isin(times.keys())]
+    top_speed = available.groupby('Base_Location')['Speed_kmph'].max()
+    fastest_so_far = 0
+    for base in sorted(top_speed.index, key=lambda base: (times[base], -top_speed[base])):
+        if top_speed[base] > fastest_so_far:
+            targets.append(base)
+            fastest_so_far = top_speed[base]
+    return set(targets)
+
+
+def transit_edges(region, shard, boundary_ids):
+    """Transit hops from each of the region's boundary nodes to its hop targets"""
+    G = nx.Graph()
+    G.add_nodes_from(shard['nodes']['ID'])
+    for _, row in shard['edges'].iterrows():
+        G.add_edge(row['From'], row['To'], weight=row['Travel_Time_min'], distance=row['Distance_km'])
+
+    rows = []
+    for source in sorted(node for node in G.nodes if node in boundary_ids):
+        times, paths = nx.single_source_dijkstra(G, source, weight='weight')
+        for target in sorted(hop_targets(times, shard['nodes'], shard['rescue_teams'], boundary_ids)):
+            # Each boundary pair only needs one hop
+            if target == source or (target in boundary_ids and target < source):
+                continue
+            # A route through another boundary node is already two shorter hops
+            path = paths[target]
+            if any(node in boundary_ids for node in path[1:-1]):
+                continue
+            rows.append({
+                'From': source,
+                'To': target,
+                'Distance_km': sum(G[path[j]][path[j + 1]]['distance'] for j in range(len(path) - 1)),
+                'Road_Condition': 'Transit',
+                'Risk_Factor': 0,
+                'Travel_Time_min': times[target],
+                'Transit_Region': region
+            })
+    return pd.DataFrame(rows, columns=['From', 'To', 'Distance_km', 'Road_Condition', 'Risk_Factor', 'Travel_Time_min', 'Transit_Region'])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] != 'split':
+        print("Usage: python regions.py split districts.csv [output_dir]")
+        sys.exit(1)
+
+    districts_df = pd.read_csv(sys.argv[2])
+    output_dir = sys.argv[3] if len(sys.argv) > 3 else 'regions'
+    frames = {name: pd.read_csv(f'{name}.txt') for name in SHARD_FILES}
+    split_dataset(frames, districts_df, output_dir)
+    print(f"Split {len(frames['nodes'])} nodes into {len(districts_df)} regions -> {output_dir}")